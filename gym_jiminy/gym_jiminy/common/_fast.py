@@ -0,0 +1,99 @@
+## @file
+
+"""
+@package    gym_jiminy
+
+@brief      Numba-compiled kernels used on the hot path of Gym Jiminy environments.
+
+@remark     This is a hidden module that is not automatically imported using
+            'from gym_jiminy.common import *'.
+"""
+
+from numba import njit, prange
+
+
+@njit(cache=True)
+def is_terminal(x, theta, x_thr, theta_thr):
+    """
+    @brief      Terminal condition of the Cartpole, shared by every other kernel.
+
+    @param[in]  x           Position of the cart
+    @param[in]  theta       Angle of the pole
+    @param[in]  x_thr       Maximum absolute position of the cart
+    @param[in]  theta_thr   Maximum absolute angle of the pole
+
+    @return     Whether the cart or the pole is out of bounds.
+    """
+    return (abs(x) > x_thr) | (abs(theta) > theta_thr)
+
+
+@njit(cache=True, fastmath=True)
+def compute_step_result(x, theta, x_thr, theta_thr, steps_beyond_done):
+    """
+    @brief      Compute the reward and the terminal condition of the Cartpole.
+
+    @param[in]  x                   Position of the cart
+    @param[in]  theta               Angle of the pole
+    @param[in]  x_thr               Maximum absolute position of the cart
+    @param[in]  theta_thr           Maximum absolute angle of the pole
+    @param[in]  steps_beyond_done   Number of steps performed after having met the
+                                    stopping criterion, -1 if not met yet.
+
+    @return     The reward, the terminal flag, and the updated number of steps
+                performed after having met the stopping criterion.
+    """
+    if not is_terminal(x, theta, x_thr, theta_thr):
+        return 1.0, False, steps_beyond_done
+    if steps_beyond_done < 0:
+        return 1.0, True, 0
+    return 0.0, True, steps_beyond_done + 1
+
+
+@njit(parallel=True, cache=True)
+def compute_terminals(x, theta, x_thr, theta_thr, out):
+    """
+    @brief      Compute the terminal condition of a batch of Cartpoles.
+
+    @param[in]  x           Positions of the carts (1D numpy array)
+    @param[in]  theta       Angles of the poles (1D numpy array)
+    @param[in]  x_thr       Maximum absolute position of the carts
+    @param[in]  theta_thr   Maximum absolute angle of the poles
+    @param[out] out         Terminal flags (1D boolean numpy array)
+    """
+    for i in prange(x.size):
+        out[i] = is_terminal(x[i], theta[i], x_thr, theta_thr)
+
+
+@njit(parallel=True, cache=True, fastmath=True)
+def terminals_over_trajectory(states, x_thr, theta_thr, out):
+    """
+    @brief      Compute the terminal condition of a batch of Cartpole trajectories.
+
+    @param[in]  states      States of the Cartpoles (3D numpy array: time, env, state)
+    @param[in]  x_thr       Maximum absolute position of the carts
+    @param[in]  theta_thr   Maximum absolute angle of the poles
+    @param[out] out         Terminal flags (2D boolean numpy array: time, env)
+    """
+    T, N, _ = states.shape
+    for t in prange(T):
+        for i in range(N):
+            out[t, i] = is_terminal(states[t, i, 0], states[t, i, 1], x_thr, theta_thr)
+
+
+@njit(cache=True)
+def write_actions(actions, bufs, force_mag):
+    """
+    @brief      Write the forces associated with a batch of discrete Cartpole actions
+                in the action buffers of the engines.
+
+    @param[in]  actions     Discrete actions (1D integer numpy array)
+    @param[out] bufs        Action buffers of the engines (2D numpy array: env, motor)
+    @param[in]  force_mag   Torque magnitude of the action
+    """
+    for i in range(actions.shape[0]):
+        bufs[i, 0] = force_mag if actions[i] else -force_mag
+
+
+# Compile (or load from cache) the kernel used by 'JiminyCartPoleEnv.step' at import, to keep
+# the JIT cost out of the training loop. The batched kernels are warmed up by their own users.
+compute_step_result(0.0, 0.0, 0.75, 0.43, -1)
@@ -15,7 +15,7 @@ from stable_baselines.common.tile_images import tile_images
 # It is required for parallel rendering since corbaserver does not support multiple connection simultaneously.
 lock = Lock()
 
-def _worker(remote, parent_remote, env_fn_wrapper, lock=None):
+def _worker(remote, parent_remote, env_fn_wrapper, lock=None, obs_buf=None, env_idx=None):
     """
     @brief      Worker for each subprocess of SubprocVecEnvLock.
 
@@ -35,9 +35,17 @@ def _worker(remote, parent_remote, env_fn_wrapper, lock=None):
     @param[in]  parent_remote       Parent remote
     @param[in]  env_fn_wrapper      Gym environment
     @param[in]  lock                threading.Lock object. Optional: None by default
+    @param[in]  obs_buf             Shared memory buffer of the observations of every worker.
+                                    The observations are written in it instead of being sent
+                                    through the pipe. Optional: None by default
+    @param[in]  env_idx             Index of the environment in the shared memory buffer.
+                                    Optional: Only required if `obs_buf` is specified
     """
     parent_remote.close()
     env = env_fn_wrapper.var()
+    if obs_buf is not None:
+        obs_space = env.observation_space
+        obs_shared = np.frombuffer(obs_buf, dtype=obs_space.dtype).reshape((-1,) + obs_space.shape)[env_idx]
     while True:
         try:
             cmd, data = remote.recv()
@@ -47,9 +55,15 @@ def _worker(remote, parent_remote, env_fn_wrapper, lock=None):
                     # save final observation where user can get it, then reset
                     info['terminal_observation'] = observation
                     observation = env.reset()
+                if obs_buf is not None:
+                    obs_shared[:] = observation
+                    observation = None
                 remote.send((observation, reward, done, info))
             elif cmd == 'reset':
                 observation = env.reset()
+                if obs_buf is not None:
+                    obs_shared[:] = observation
+                    observation = None
                 remote.send(observation)
             elif cmd == 'render':
                 remote.send(env.render(*data[0], lock=lock, **data[1]))
@@ -81,11 +95,15 @@ class SubprocVecEnvLock(SubprocVecEnv):
                 rendering in Gepetto-viewer. It is the only difference with the
                 based class `SubprocVecEnv` provided by Gym OpenAI.
 
+                Optionally, the observations can be exchanged through a shared memory
+                buffer instead of being pickled and sent through the pipes. It is only
+                supported for `gym.spaces.Box` observation spaces.
+
     @warning    For performance reasons, if your environment is not IO bound, the
                 number of environments should not exceed the number of logical cores
                 on your CPU.
     """
-    def __init__(self, env_fns, start_method=None):
+    def __init__(self, env_fns, start_method=None, shared_memory=False):
         """
         @brief      Constructor
 
@@ -101,6 +119,10 @@ class SubprocVecEnvLock(SubprocVecEnv):
         @param[in]  start_method        Method used to start the subprocesses. Must be one of the
                                         methods returned by multiprocessing.get_all_start_methods().
                                         Optional: Defaults to 'fork' on available platforms, and 'spawn' otherwise.
+        @param[in]  shared_memory       Whether to exchange the observations through shared memory.
+                                        Note that a temporary environment is created in the main
+                                        process to get the observation space.
+                                        Optional: False by default
 
         @return     Instance of SubprocVecEnvLock.
         """
@@ -118,10 +140,24 @@ class SubprocVecEnvLock(SubprocVecEnv):
             start_method = 'fork' if fork_available else 'spawn'
         ctx = multiprocessing.get_context(start_method)
 
+        # Allocate the shared memory buffer of the observations if requested
+        obs_buf = None
+        self._obs_shared = None
+        if shared_memory:
+            env = env_fns[0]()
+            obs_space = env.observation_space
+            env.close()
+            del env
+            assert isinstance(obs_space, gym.spaces.Box), \
+                "Shared memory is only supported for 'gym.spaces.Box' observation spaces."
+            obs_buf = ctx.Array(np.ctypeslib.as_ctypes_type(obs_space.dtype),
+                                n_envs * int(np.prod(obs_space.shape)), lock=False)
+            self._obs_shared = np.frombuffer(obs_buf, dtype=obs_space.dtype).reshape((n_envs,) + obs_space.shape)
+
         self.remotes, self.work_remotes = zip(*[ctx.Pipe() for _ in range(n_envs)])
         self.processes = []
-        for work_remote, remote, env_fn in zip(self.work_remotes, self.remotes, env_fns):
-            args = (work_remote, remote, CloudpickleWrapper(env_fn), lock)
+        for env_idx, (work_remote, remote, env_fn) in enumerate(zip(self.work_remotes, self.remotes, env_fns)):
+            args = (work_remote, remote, CloudpickleWrapper(env_fn), lock, obs_buf, env_idx)
             # daemon=True: if the main process crashes, we should not cause things to hang
             process = ctx.Process(target=_worker, args=args, daemon=True)
             process.start()
@@ -132,6 +168,33 @@ class SubprocVecEnvLock(SubprocVecEnv):
         observation_space, action_space = self.remotes[0].recv()
         VecEnv.__init__(self, len(env_fns), observation_space, action_space)
 
+    def step_wait(self):
+        """
+        @brief      Wait for the step taken with `step_async`.
+
+        @return     The batched observations, rewards, status of the simulations
+                    (done or not), and the tuple of dictionaries of extra information.
+        """
+        if self._obs_shared is None:
+            return super(SubprocVecEnvLock, self).step_wait()
+        results = [remote.recv() for remote in self.remotes]
+        self.waiting = False
+        _, rews, dones, infos = zip(*results)
+        return self._obs_shared.copy(), np.stack(rews), np.stack(dones), infos
+
+    def reset(self):
+        """
+        @brief      Reset every environment.
+
+        @return     The batched initial observations
+        """
+        if self._obs_shared is None:
+            return super(SubprocVecEnvLock, self).reset()
+        for remote in self.remotes:
+            remote.send(('reset', None))
+        for remote in self.remotes:
+            remote.recv()
+        return self._obs_shared.copy()
 
     def render(self, mode='rgb_array', *args, **kwargs):
         """
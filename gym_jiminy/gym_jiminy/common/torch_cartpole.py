@@ -0,0 +1,170 @@
+## @file
+
+"""
+@package    gym_jiminy
+
+@brief      Batched Cartpole dynamics running on GPU for massively parallel rollouts.
+
+@remark     This module requires PyTorch, which is not a dependency of Gym Jiminy. It is
+            not automatically imported using 'from gym_jiminy.common import *'.
+"""
+
+from math import pi
+
+import torch
+
+
+## Mass of the cart (see 'cartpole/cartpole.urdf')
+_CART_MASS = 1.0
+## Mass of the pole
+_POLE_MASS = 10.0
+## Distance between the joint and the center of mass of the pole
+_POLE_COM_LENGTH = 0.5
+## Rotational inertia of the pole around its center of mass
+_POLE_INERTIA = 1.0
+## Gravity acceleration
+_GRAVITY = 9.81
+
+
+class TorchCartPoleVecEnv(object):
+    """
+    @brief      Vectorized Cartpole environment integrating the closed-form equations of
+                motion of a batch of Cartpoles with PyTorch.
+
+    @details    It mirrors `JiminyCartPoleEnv`: same state, actions, reward, termination
+                and initial state distribution, but it bypasses Jiminy Engine completely.
+                The whole batch is stored in a single `(N, 4)` tensor on the same device
+                as the policy, so that no host-device transfer is required at each step.
+                The dynamics is integrated using semi-implicit Euler scheme. Each
+                environment is reset automatically as soon as it reaches a terminal state.
+
+    @remark     The physical parameters are hard-coded from the URDF model of the Cartpole.
+                It is only suitable for training. Use `JiminyCartPoleEnv` for evaluation.
+    """
+    def __init__(self, num_envs, device=None, dt=2.0e-3, seed=None):
+        """
+        @brief      Constructor
+
+        @param[in]  num_envs    Number of environments to run
+        @param[in]  device      Device on which to run the simulations.
+                                Optional: 'cuda' if available, 'cpu' otherwise.
+        @param[in]  dt          Time step of the 'step' method. Optional: 2ms by default
+        @param[in]  seed        Seed of the random number generator. Optional: Random seed by default.
+
+        @return     Instance of the vectorized environment.
+        """
+
+        if device is None:
+            device = 'cuda' if torch.cuda.is_available() else 'cpu'
+
+        ## Number of environments
+        self.num_envs = num_envs
+        ## Device on which the simulations are running
+        self.device = torch.device(device)
+        ## Time step of the 'step' method
+        self.dt = dt
+
+        ## Torque magnitude of the action
+        self.force_mag = 40.0
+        ## Maximum absolute angle of the pole before considering the episode failed
+        self.theta_threshold_radians = 25 * pi / 180
+        ## Maximum absolute position of the cart before considering the episode failed
+        self.x_threshold = 0.75
+        ## Higher bound of the hypercube associated with the initial state of the robot
+        self.state_random_high = torch.tensor([0.5, 0.15, 0.1, 0.1], device=self.device)
+
+        ## Batched state of the Cartpoles (2D tensor: env, state)
+        self.state = torch.zeros((num_envs, 4), device=self.device)
+
+        self._generator = torch.Generator(device=self.device)
+        self.seed(seed)
+
+    def seed(self, seed=None):
+        """
+        @brief      Specify the seed of the simulations.
+
+        @param[in]  seed    Desired seed. Optional: The seed will be randomly generated if omitted.
+
+        @return     Updated seed of the simulations
+        """
+        if seed is None:
+            seed = self._generator.seed()
+        else:
+            self._generator.manual_seed(seed)
+        return [seed]
+
+    def reset(self):
+        """
+        @brief      Reset every simulation.
+
+        @return     Batched initial states of the simulations (2D tensor: env, state)
+        """
+        self.state = self._sample_state()
+        return self.state
+
+    def step(self, actions):
+        """
+        @brief      Run a simulation step for every environment.
+
+        @param[in]  actions     Batch of discrete actions: 0 to push the cart to the left,
+                                1 to push it to the right (1D tensor or array)
+
+        @remark     A full batch of initial states is sampled at every step, even if no
+                    environment is done, since selecting the ones to reset beforehand would
+                    require a synchronization between the host and the device. Its cost is
+                    of the same order as the integration of the dynamics itself.
+
+        @return     The batched next states, rewards, status of the simulations (done or not),
+                    and a dictionary containing the batched terminal states.
+        """
+        actions = torch.as_tensor(actions, device=self.device)
+        force = self.force_mag * (2.0 * actions.to(self.state.dtype) - 1.0)
+
+        x, theta, x_dot, theta_dot = self.state.unbind(-1)
+        sin_theta, cos_theta = torch.sin(theta), torch.cos(theta)
+
+        # Solve the equations of motion of the Cartpole for the accelerations:
+        #   | M          m*l*cos |   | x_ddot     |   | F + m*l*sin*theta_dot^2 |
+        #   | m*l*cos    J       | * | theta_ddot | = | m*g*l*sin               |
+        mass_total = _CART_MASS + _POLE_MASS
+        inertia_total = _POLE_MASS * _POLE_COM_LENGTH ** 2 + _POLE_INERTIA
+        coupling = _POLE_MASS * _POLE_COM_LENGTH * cos_theta
+        rhs_x = force + _POLE_MASS * _POLE_COM_LENGTH * sin_theta * theta_dot ** 2
+        rhs_theta = _POLE_MASS * _GRAVITY * _POLE_COM_LENGTH * sin_theta
+        det = mass_total * inertia_total - coupling ** 2
+        x_ddot = (inertia_total * rhs_x - coupling * rhs_theta) / det
+        theta_ddot = (mass_total * rhs_theta - coupling * rhs_x) / det
+
+        # Semi-implicit Euler integration
+        x_dot = x_dot + self.dt * x_ddot
+        theta_dot = theta_dot + self.dt * theta_ddot
+        x = x + self.dt * x_dot
+        theta = theta + self.dt * theta_dot
+        state = torch.stack([x, theta, x_dot, theta_dot], -1)
+
+        # Check the terminal condition, then reset the environments that are done without
+        # any synchronization between the host and the device.
+        done = (x.abs() > self.x_threshold) | (theta.abs() > self.theta_threshold_radians)
+        self.state = torch.where(done.unsqueeze(-1), self._sample_state(), state)
+
+        # The reward is always 1 because of auto-reset. A new tensor is returned at every step,
+        # so that it can be modified in-place safely.
+        reward = torch.ones_like(done, dtype=self.state.dtype)
+
+        return self.state, reward, done, {'terminal_observation': state}
+
+    def _sample_state(self):
+        """
+        @brief      Sample a batch of initial states.
+
+        @details    The initial states are randomly sampled using a uniform distribution
+                    between `-self.state_random_high` and `self.state_random_high`.
+
+        @remark     This is a hidden function that is not listed as part of the
+                    member methods of the class. It is not intended to be called
+                    manually.
+
+        @return     Batch of initial states (2D tensor: env, state)
+        """
+        sample = torch.rand((self.num_envs, 4), generator=self._generator, device=self.device)
+        return (2.0 * sample - 1.0) * self.state_random_high
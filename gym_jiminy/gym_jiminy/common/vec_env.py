@@ -0,0 +1,163 @@
+## @file
+
+import numpy as np
+
+from gym.vector import VectorEnv
+
+from ..envs.cartpole import JiminyCartPoleEnv
+from ._fast import compute_terminals, write_actions
+
+
+# Compile (or load from cache) the batched kernels at import, to keep the JIT cost out of
+# the training loop.
+compute_terminals(np.zeros(1), np.zeros(1), 0.75, 0.43, np.empty(1, dtype=np.bool_))
+write_actions(np.zeros(1, dtype=np.int64), np.zeros((1, 1)), 40.0)
+
+
+class JiminyCartPoleVecEnv(VectorEnv):
+    """
+    @brief      Vectorized Gym environment running several Jiminy Cartpole simulations
+                sequentially in the current process.
+
+    @details    It implements the vectorized API of Gym OpenAI. The observations,
+                rewards and terminal flags of every environment are gathered in
+                preallocated batched buffers, and the termination is checked once for
+                the whole batch. Each environment is reset automatically as soon as it
+                reaches a terminal state, in which case the terminal observation is
+                stored in the field 'terminal_observation' of its info dictionary.
+
+    @remark     The Python bookkeeping of `JiminyCartPoleEnv.step` is bypassed to max
+                out the performances, so the `state` and `steps_beyond_done` attributes
+                of the underlying environments are not updated by `step`.
+    """
+    def __init__(self, num_envs, copy=True, **kwargs):
+        """
+        @brief      Constructor
+
+        @param[in]  num_envs    Number of environments to run
+        @param[in]  copy        Whether to return a copy of the batched buffers or the
+                                buffers themselves, which are overwritten at every step.
+                                Optional: True by default
+        @param[in]  kwargs      Keyword arguments forwarded to the constructor of every
+                                `JiminyCartPoleEnv`, for instance the integration scheme.
+
+        @return     Instance of the vectorized environment.
+        """
+
+        ## Underlying Jiminy Cartpole environments
+        self.envs = [JiminyCartPoleEnv(**kwargs) for _ in range(num_envs)]
+        ## Whether to return a copy of the batched buffers
+        self.copy = copy
+
+        super(JiminyCartPoleVecEnv, self).__init__(num_envs,
+                                                   self.envs[0].observation_space,
+                                                   self.envs[0].action_space)
+
+        ## Update period of the simulations
+        self.dt = self.envs[0].dt
+        ## Torque magnitude of the action
+        self.force_mag = self.envs[0].force_mag
+        ## Maximum absolute angle of the pole before considering the episode failed
+        self.theta_threshold_radians = self.envs[0].theta_threshold_radians
+        ## Maximum absolute position of the cart before considering the episode failed
+        self.x_threshold = self.envs[0].x_threshold
+
+        # The states are stored as a structure of arrays, so that each component is contiguous
+        # in memory for the whole batch. The observations are single-precision copies of them.
+        self._states = np.empty((4, num_envs), dtype=np.float64)
+        self._xs, self._thetas, self._x_dots, self._theta_dots = self._states
+        self._obs = np.empty((num_envs, 4), dtype=self.single_observation_space.dtype)
+        self._rew = np.ones(num_envs, dtype=np.float32) # The reward is always 1 because of auto-reset
+        self._done = np.empty(num_envs, dtype=np.bool_)
+        self._actions = None
+
+        # Make the action buffer of every engine a row of a single batched buffer,
+        # so that the actions of all the environments can be written at once.
+        self._action_bufs = np.zeros((num_envs, len(self.envs[0].engine_py._action)))
+        for env, action_buf in zip(self.envs, self._action_bufs):
+            env.engine_py._action = action_buf
+            env._action_buf = action_buf
+
+    def seed(self, seeds=None):
+        """
+        @brief      Specify the seed of every simulation.
+
+        @param[in]  seeds   Seed for the first environment, or list of seeds for each environment.
+                            Optional: The seeds will be randomly generated if omitted.
+
+        @return     List of updated seeds
+        """
+        if seeds is None:
+            seeds = [None for _ in range(self.num_envs)]
+        if isinstance(seeds, int):
+            seeds = [seeds + i for i in range(self.num_envs)]
+        assert len(seeds) == self.num_envs
+        return [env.seed(seed)[0] for env, seed in zip(self.envs, seeds)]
+
+    def reset_wait(self):
+        """
+        @brief      Reset every simulation.
+
+        @return     Batched initial states of the simulations
+        """
+        for i, env in enumerate(self.envs):
+            env.reset()
+            self._states[:, i] = env.state
+        np.copyto(self._obs, self._states.T)
+        return self._obs.copy() if self.copy else self._obs
+
+    def step_async(self, actions):
+        """
+        @brief      Store the actions to perform at the next call to `step_wait`.
+
+        @param[in]  actions     Batch of actions (one for each environment)
+        """
+        self._actions = actions
+
+    def step_wait(self):
+        """
+        @brief      Run a simulation step for every environment.
+
+        @return     The batched next states, rewards, status of the simulations
+                    (done or not), and a list of dictionaries of extra information.
+        """
+        # Bypass 'JiminyCartPoleEnv.step' and use direct assignment to max out the performances
+        actions = np.asarray(self._actions)
+        assert ((actions == 0) | (actions == 1)).all(), "%r invalid"%(actions,)
+        write_actions(actions.astype(np.int64), self._action_bufs, self.force_mag)
+        for i, env in enumerate(self.envs):
+            env.engine_py.step(dt_desired=self.dt)
+            self._states[:, i] = env.engine_py.state
+
+        # Check the terminal condition for the whole batch at once
+        compute_terminals(self._xs, self._thetas,
+                          self.x_threshold, self.theta_threshold_radians, self._done)
+
+        # Reset the environments that are done
+        infos = [{} for _ in range(self.num_envs)]
+        for i in np.flatnonzero(self._done):
+            infos[i]['terminal_observation'] = self._states[:, i].astype(self._obs.dtype)
+            self.envs[i].reset()
+            self._states[:, i] = self.envs[i].state
+        np.copyto(self._obs, self._states.T)
+
+        if self.copy:
+            return self._obs.copy(), np.copy(self._rew), np.copy(self._done), infos
+        return self._obs, self._rew, self._done, infos
+
+    def render(self, mode='human'):
+        """
+        @brief      Render the current state of the first simulation in Gepetto-viewer.
+
+        @param[in]  mode    Unused. Defined for compatibility with Gym OpenAI.
+
+        @return     Fake output for compatibility with Gym OpenAI.
+        """
+        return self.envs[0].render(mode)
+
+    def close_extras(self, **kwargs):
+        """
+        @brief      Terminate every Python Jiminy engine.
+        """
+        for env in self.envs:
+            env.close()
@@ -12,6 +12,47 @@ from jiminy_py import core as jiminy
 from jiminy_py.engine_asynchronous import EngineAsynchronous
 
 from ..common.gym_jiminy_robots import RobotJiminyEnv
+from ..common._fast import compute_step_result, terminals_over_trajectory
+
+
+## Options of the model overwritten for every instance of the environment
+_MODEL_OPTIONS_PATCH = {
+    "telemetry": {
+        "enableEncoderSensors": False
+    }
+}
+
+## Options of the engine overwritten for every instance of the environment
+_ENGINE_OPTIONS_PATCH = {
+    "telemetry": {
+        "enableConfiguration": False,
+        "enableVelocity": False,
+        "enableAcceleration": False,
+        "enableCommand": False,
+        "enableEnergy": False
+    }
+}
+
+
+def _deep_merge(options, patch):
+    """
+    @brief      Recursively update a dictionary of options in-place.
+
+    @remark     This is a hidden function that is not listed as part of the
+                member methods of the module. It is not intended to be called
+                manually.
+
+    @param[in]  options     Dictionary of options to update
+    @param[in]  patch       Nested dictionary of the options to overwrite
+
+    @return     The updated dictionary of options.
+    """
+    for key, value in patch.items():
+        if isinstance(value, dict):
+            _deep_merge(options[key], value)
+        else:
+            options[key] = value
+    return options
 
 
 class JiminyCartPoleEnv(RobotJiminyEnv):
@@ -67,10 +108,18 @@ class JiminyCartPoleEnv(RobotJiminyEnv):
         'render.modes': ['human']
     }
 
-    def __init__(self):
+    def __init__(self, solver="explicit_euler", dt=2.0e-3):
         """
         @brief      Constructor
 
+        @details    The explicit Euler scheme is several times cheaper than the adaptive
+                    Runge-Kutta Dormand-Prince scheme, and accurate enough for training.
+                    The latter is preferable for evaluation.
+
+        @param[in]  solver  Integration scheme of the engine, either "explicit_euler"
+                            or "runge_kutta_dopri5". Optional: "explicit_euler" by default
+        @param[in]  dt      Time step of the 'step' method. Optional: 2ms by default
+
         @return     Instance of the environment.
         """
 
@@ -100,24 +149,11 @@ class JiminyCartPoleEnv(RobotJiminyEnv):
 
         # ############################### Configure Jiminy #####################################
 
-        model_options = self._model.get_model_options()
-        sensors_options = self._model.get_sensors_options()
-        engine_options = engine_py.get_engine_options()
-        ctrl_options = engine_py.get_controller_options()
-
-        model_options["telemetry"]["enableEncoderSensors"] = False
-        engine_options["telemetry"]["enableConfiguration"] = False
-        engine_options["telemetry"]["enableVelocity"] = False
-        engine_options["telemetry"]["enableAcceleration"] = False
-        engine_options["telemetry"]["enableCommand"] = False
-        engine_options["telemetry"]["enableEnergy"] = False
-
-        engine_options["stepper"]["solver"] = "runge_kutta_dopri5" # ["runge_kutta_dopri5", "explicit_euler"]
-
-        self._model.set_model_options(model_options)
-        self._model.set_sensors_options(sensors_options)
+        # The sensors and controller options are left untouched, so there is no need to set them
+        self._model.set_model_options(_deep_merge(self._model.get_model_options(), _MODEL_OPTIONS_PATCH))
+        engine_options = _deep_merge(engine_py.get_engine_options(), _ENGINE_OPTIONS_PATCH)
+        engine_options["stepper"]["solver"] = solver
         engine_py.set_engine_options(engine_options)
-        engine_py.set_controller_options(ctrl_options)
 
         # ##################### Define some problem-specific variables #########################
 
@@ -129,10 +165,18 @@ class JiminyCartPoleEnv(RobotJiminyEnv):
         ## Maximum absolute position of the cart before considering the episode failed
         self.x_threshold = 0.75
 
+        # Internal lookup table of the force associated with each action
+        self._force_lookup = np.array([-self.force_mag, self.force_mag])
+
         # ####################### Configure the learning environment ###########################
 
-        # The time step of the 'step' method
-        dt = 2.0e-3
+        # Buffer in which the state of the engine is copied, to which `self.state` is bound.
+        # It must be allocated before calling the base constructor since it calls `seed`.
+        self._state_buf = np.empty(self._model.nx)
+
+        # Buffers used by `reset` to sample the initial state without allocating any array
+        self._reset_buf = np.empty(self._model.nx)
+        self._reset_range = np.empty(self._model.nx)
 
         super(JiminyCartPoleEnv, self).__init__("cartpole", engine_py, dt)
 
@@ -141,17 +185,23 @@ class JiminyCartPoleEnv(RobotJiminyEnv):
         # Bounds of the observation space.
         # Note that the Angle limit set to 2 * theta_threshold_radians
         # so failing observation is still within bounds
+        # Note that the observations are single-precision, as expected by most neural
+        # network implementations. It halves their memory footprint in replay buffers.
         high = np.array([self.x_threshold * 2,
                          self.theta_threshold_radians * 2,
-                         np.finfo(np.float64).max,
-                         np.finfo(np.float64).max])
+                         np.finfo(np.float32).max,
+                         np.finfo(np.float32).max], dtype=np.float32)
 
-        self.observation_space = spaces.Box(low=-high, high=high, dtype=np.float64)
+        self.observation_space = spaces.Box(low=-high, high=high, dtype=np.float32)
 
         self.state_random_high = np.array([0.5, 0.15, 0.1, 0.1])
         self.state_random_low = -self.state_random_high
 
         self.action_space = spaces.Discrete(2) # Force using a discrete action space
+        self._valid_actions = tuple(range(self.action_space.n))
+
+        # Direct reference to the action buffer of the engine, used by `step`
+        self._action_buf = self.engine_py._action
 
 
     def step(self, action):
@@ -164,30 +214,72 @@ class JiminyCartPoleEnv(RobotJiminyEnv):
         @return     The next state, the reward, the status of the simulation (done or not),
                     and an empty dictionary for compatibility with Gym OpenAI.
         """
-        assert self.action_space.contains(action), "%r (%s) invalid"%(action, type(action))
+        assert action in self._valid_actions, "%r (%s) invalid"%(action, type(action))
+        action = int(action)
+
+        # Promote the attributes used on the hot path to local variables
+        engine_py, action_buf, state_buf = self.engine_py, self._action_buf, self._state_buf
 
         # Bypass 'action' setter and use direct assignment to max out the performances
-        if action == 1:
-            self.engine_py._action[0] = self.force_mag
-        else:
-            self.engine_py._action[0] = -self.force_mag
-        self.engine_py.step(dt_desired=self.dt)
-        self.state = self.engine_py.state
+        action_buf[0] = self._force_lookup[action]
+        engine_py.step(dt_desired=self.dt)
+        np.copyto(state_buf, engine_py.state)
 
         # Check the terminal condition and compute reward
-        done = self._is_success()
-        reward = 0.0
-        if not done:
-            reward += 1.0
-        elif self.steps_beyond_done is None:
-            self.steps_beyond_done = 0
-            reward += 1.0
-        else:
-            if self.steps_beyond_done == 0:
+        reward, done, steps_beyond_done = compute_step_result(
+            state_buf[0], state_buf[1], self.x_threshold, self.theta_threshold_radians,
+            -1 if self.steps_beyond_done is None else self.steps_beyond_done)
+        if steps_beyond_done >= 0:
+            if steps_beyond_done == 1:
                 logger.warn("You are calling 'step()' even though this environment has already returned done = True. You should always call 'reset()' once you receive 'done = True' -- any further steps are undefined behavior.")
-            self.steps_beyond_done += 1
+            self.steps_beyond_done = steps_beyond_done
+
+        return self._get_obs(), reward, done, {}
+
+
+    def seed(self, seed=None):
+        """
+        @brief      Specify the seed of the simulation.
+
+        @details    The random number generator is a PCG64 `numpy.random.Generator`,
+                    which is faster than the legacy Mersenne Twister for small draws.
+
+        @remark     See documentation of `RobotJiminyEnv` for details.
+
+        @param[in]  seed    Desired seed as a Unsigned Integer 32bit
+                            Optional: The seed will be randomly generated using np if omitted.
+
+        @return     Updated seed of the simulation
+        """
+        seed = seeding.create_seed(seed, max_bytes=4)
+        self._rng = np.random.Generator(np.random.PCG64(seed))
+        self.np_random = self._rng
+        self.engine_py.seed(seed)
+        np.copyto(self._state_buf, self.engine_py.state)
+        self.state = self._state_buf
+        return [seed]
+
 
-        return self.state, reward, done, {}
+    def reset(self):
+        """
+        @brief      Reset the simulation.
+
+        @details    The initial state is sampled in-place in a preallocated buffer.
+
+        @remark     See documentation of `RobotJiminyEnv` for details.
+
+        @return     Initial state of the simulation
+        """
+        reset_buf = self._reset_buf
+        self._rng.random(out=reset_buf)
+        np.subtract(self.state_random_high, self.state_random_low, out=self._reset_range)
+        reset_buf *= self._reset_range
+        reset_buf += self.state_random_low
+        self.engine_py.reset(reset_buf)
+        self.steps_beyond_done = None
+        np.copyto(self._state_buf, self.engine_py.state)
+        self.state = self._state_buf
+        return self._get_obs()
 
 
     def _get_obs(self):
@@ -195,27 +287,34 @@ class JiminyCartPoleEnv(RobotJiminyEnv):
         @brief      Get the current observation based on the current state of the model.
                     Mostly defined for compatibility with Gym OpenAI.
 
+        @details    A new single-precision array is returned at every call, so that the
+                    observation can be stored or modified without altering the state
+                    of the environment.
+
         @remark     This is a hidden function that is not listed as part of the
                     member methods of the class. It is not intended to be called
                     manually.
 
         @return     The current state of the model
         """
-        return self.state
+        return self.state.astype(self.observation_space.dtype)
 
 
-    def _is_success(self):
+    def compute_terminals_batch(self, states):
         """
-        @brief      Determine whether the desired goal has been achieved.
+        @brief      Compute the terminal condition for a batch of trajectories at once.
 
-        @remark     This is a hidden function that is not listed as part of the
-                    member methods of the class. It is not intended to be called
-                    manually.
+        @details    It is mainly intended for post-processing of rollouts, for instance
+                    for goal relabeling.
+
+        @remark     The underlying kernel is compiled (or loaded from cache) at the first call,
+                    so this one is slower than the next ones.
+
+        @param[in]  states  States of the Cartpoles (3D numpy array: time, env, state)
 
-        @return     Boolean flag
+        @return     Terminal flags (2D boolean numpy array: time, env)
         """
-        x, theta, x_dot, theta_dot = self.state
-        return        x < -self.x_threshold \
-               or     x >  self.x_threshold \
-               or theta < -self.theta_threshold_radians \
-               or theta >  self.theta_threshold_radians
+        states = np.asarray(states, dtype=np.float64)
+        out = np.empty(states.shape[:2], dtype=np.bool_)
+        terminals_over_trajectory(states, self.x_threshold, self.theta_threshold_radians, out)
+        return out
@@ -1,8 +1,10 @@
 import os
 import time
 
+import numpy as np
 import gym
 
+from stable_baselines.common.vec_env import VecEnv
 from stable_baselines.her import GoalSelectionStrategy
 from stable_baselines.sac.policies import FeedForwardPolicy
 from stable_baselines import HER, DQN, SAC, DDPG, TD3
@@ -69,6 +71,46 @@ model.learn(total_timesteps=400000,
 
 ### Enjoy a trained agent
 
+def enjoy(env, model, t_end, obs=None, realtime=True):
+    """
+    @brief      Run a trained agent and render it.
+
+    @details    The policy is evaluated once per step for every environment at once
+                if `env` is a vectorized environment.
+
+    @param[in]  env         Gym environment or vectorized environment
+    @param[in]  model       Trained model
+    @param[in]  t_end       Duration of the simulation in seconds
+    @param[in]  obs         Initial observation. Optional: Reset the environment if omitted.
+    @param[in]  realtime    Whether to wait between the steps to run in real-time.
+                            Disable it to evaluate the agent at full speed.
+                            Optional: True by default
+    """
+    is_vec_env = isinstance(env, VecEnv)
+    dt = env.get_attr('dt')[0] if is_vec_env else env.dt
+    if obs is None:
+        obs = env.reset()
+    episode_reward = np.zeros(env.num_envs) if is_vec_env else 0
+    for _ in range(int(t_end/dt)):
+        t0 = time.perf_counter()
+        action, _states = model.predict(obs, deterministic=True)
+        obs, reward, done, info = env.step(action)
+        env.render()
+        episode_reward += reward
+
+        if is_vec_env:
+            for i in np.flatnonzero(done):
+                print("Env:", i, "Reward:", episode_reward[i],
+                      "Success:", info[i].get('is_success', False))
+                episode_reward[i] = 0
+        elif done or info.get('is_success', False):
+            print("Reward:", episode_reward,
+                  "Success:", info.get('is_success', False))
+            break
+
+        if realtime:
+            time.sleep(max(0, dt - (time.perf_counter() - t0)))
+
 # duration of the simulations in seconds
 t_end = 20
 
@@ -78,16 +120,4 @@ desired_goal = 0.95 * env.env._tipPosZMax # As difficult as possible
 # Run the simulation in real-time
 env.reset()
 env.env.goal[0] = desired_goal
-obs = env.env._get_obs()
-episode_reward = 0
-for _ in range(int(t_end/env.dt)):
-    action, _states = model.predict(obs, deterministic=True)
-    obs, reward, done, info = env.step(action)
-    env.render()
-    time.sleep(env.dt)
-
-    episode_reward += reward
-    if done or info.get('is_success', False):
-        print("Reward:", episode_reward,
-              "Success:", info.get('is_success', False))
-        break
+enjoy(env, model, t_end, obs=env.env._get_obs())
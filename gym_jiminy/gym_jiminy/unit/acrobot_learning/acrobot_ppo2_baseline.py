@@ -12,7 +12,8 @@ from gym_jiminy.common import SubprocVecEnvLock
 
 ### Create a multiprocess environment
 nb_cpu = 4
-env = SubprocVecEnvLock([lambda: gym.make("gym_jiminy:jiminy-acrobot-v0") for _ in range(nb_cpu)])
+env = SubprocVecEnvLock([lambda: gym.make("gym_jiminy:jiminy-acrobot-v0") for _ in range(nb_cpu)],
+                        shared_memory=True)
 
 ### Create the model or load one
 
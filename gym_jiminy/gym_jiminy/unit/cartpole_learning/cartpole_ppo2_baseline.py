@@ -8,10 +8,12 @@ from stable_baselines import PPO2
 
 import jiminy_py
 from gym_jiminy.common import SubprocVecEnvLock
+from gym_jiminy.common.vec_env import JiminyCartPoleVecEnv
 
 ### Create a multiprocess environment
 n_thread = 4
-env = SubprocVecEnvLock([lambda: gym.make("gym_jiminy:jiminy-cartpole-v0") for _ in range(n_thread)])
+env = SubprocVecEnvLock([lambda: gym.make("gym_jiminy:jiminy-cartpole-v0") for _ in range(n_thread)],
+                        shared_memory=True)
 
 ### Create the model or load one
 
@@ -39,15 +41,15 @@ model.learn(total_timesteps=400000,
 # duration of the simulations in seconds
 t_end = 20
 
-# Get the time step of Jiminy
-env.remotes[0].send(('get_attr','dt'))
-dt = env.remotes[0].recv()
-
-# Run the simulation in real-time
-obs = env.reset()
-for _ in range(int(t_end/dt)):
-    action, _states = model.predict(obs)
-    obs, rewards, done, info = env.step(action)
-    env.remotes[0].send(('render',((), {'mode': 'rgb_array'})))
-    env.remotes[0].recv()
-    time.sleep(dt)
+# Create an in-process vectorized environment for evaluation, using an accurate integration scheme
+vec_env = JiminyCartPoleVecEnv(n_thread, solver="runge_kutta_dopri5")
+
+# Run the simulation in real-time.
+# The policy is evaluated once per step for all the environments at once.
+obs = vec_env.reset()
+for _ in range(int(t_end/vec_env.dt)):
+    t0 = time.perf_counter()
+    actions, _states = model.predict(obs, deterministic=True)
+    obs, rewards, dones, infos = vec_env.step(actions)
+    vec_env.render()
+    time.sleep(max(0, vec_env.dt - (time.perf_counter() - t0)))
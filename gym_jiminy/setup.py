@@ -14,6 +14,7 @@ setup(name = 'gym_jiminy',
       include_package_data = True, # make sure the data folder is included
       install_requires = [
             'gym',
+            'numba',
             'stable_baselines',
             'jiminy-py==1.0.6'
             ]
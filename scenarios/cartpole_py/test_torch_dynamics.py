@@ -0,0 +1,34 @@
+import numpy as np
+import torch
+
+from gym_jiminy.envs.cartpole import JiminyCartPoleEnv
+from gym_jiminy.common.torch_cartpole import TorchCartPoleVecEnv
+
+
+n_steps = 300
+action_period = 10
+tol = 1e-2
+
+# Reference simulation, using an accurate integration scheme
+env = JiminyCartPoleEnv(solver="runge_kutta_dopri5")
+env.seed(0)
+env.reset()
+
+# Closed-form simulation, starting from the same initial state
+torch_env = TorchCartPoleVecEnv(1, device='cpu', dt=env.dt)
+torch_env.state = torch.as_tensor(env.state, dtype=torch.float64).unsqueeze(0)
+
+# Fixed action sequence, switching the direction of the force periodically
+for i in range(n_steps):
+    action = (i // action_period) % 2
+    _, _, done, _ = env.step(action)
+    _, _, _, info = torch_env.step(torch.tensor([action]))
+
+    # Compare the states before the automatic reset of the closed-form simulation
+    state_torch = info['terminal_observation'][0].numpy()
+    assert np.allclose(env.state, state_torch, atol=tol), \
+        "Trajectories diverged at step {}: {} != {}".format(i, env.state, state_torch)
+    if done:
+        break
+
+print("Trajectories match within {} over {} steps.".format(tol, i + 1))